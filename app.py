@@ -1,193 +1,90 @@
-from fastapi import FastAPI, Form
-from fastapi.responses import HTMLResponse, StreamingResponse
-from io import BytesIO
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.responses import HTMLResponse, Response
 from datetime import date
-
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-
-app = FastAPI()
-
-DISCLAIMER = (
-    "This Risk Assessment & Method Statement (RAMS) document has been generated for guidance purposes only. "
-    "It does not constitute legal advice. The contractor/company is responsible for reviewing, amending, and "
-    "ensuring the document is suitable for the specific task, site conditions, client requirements, and "
-    "current UK health and safety legislation before use."
-)
-
-UK_COMPLIANCE = (
-    "This RAMS has been prepared with reference to relevant UK legislation including, but not limited to: "
-    "The Health and Safety at Work etc. Act 1974, Management of Health and Safety at Work Regulations 1999, "
-    "Personal Protective Equipment at Work Regulations 2022, COSHH Regulations 2002 (where applicable), "
-    "and the Work at Height Regulations 2005 (where applicable)."
-)
-
-def _lines(text: str):
-    return [ln.strip() for ln in (text or "").splitlines() if ln.strip()]
-
-def build_pdf(data: dict) -> bytes:
-    buf = BytesIO()
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=A4,
-        leftMargin=36,
-        rightMargin=36,
-        topMargin=36,
-        bottomMargin=36
-    )
-
-    styles = getSampleStyleSheet()
-    story = []
-
-    # TITLE
-    story.append(Paragraph("<b>RISK ASSESSMENT & METHOD STATEMENT (RAMS)</b>", styles["Title"]))
-    story.append(Spacer(1, 12))
-
-    # JOB DETAILS TABLE
-    details = [
-        ["Company Name", data["company"]],
-        ["Job Title / Description", data["job_title"]],
-        ["Site Location", data["location"]],
-        ["Date", data["job_date"]],
-        ["Number of Workers", data["workers"]],
-        ["Supervisor / Responsible Person", data["supervisor"]],
-    ]
-
-    table = Table([["Project Details", ""]] + details, colWidths=[180, 320])
-    table.setStyle(TableStyle([
-        ("SPAN", (0,0), (1,0)),
-        ("BACKGROUND", (0,0), (1,0), colors.black),
-        ("TEXTCOLOR", (0,0), (1,0), colors.white),
-        ("FONTNAME", (0,0), (1,0), "Helvetica-Bold"),
-        ("GRID", (0,0), (1,-1), 0.5, colors.grey),
-        ("FONTNAME", (0,1), (0,-1), "Helvetica-Bold"),
-        ("PADDING", (0,0), (1,-1), 6),
-    ]))
-    story.append(table)
-    story.append(Spacer(1, 14))
-
-    # SCOPE OF WORKS
-    story.append(Paragraph("<b>Scope of Works</b>", styles["Heading2"]))
-    story.append(Paragraph(
-        "The works covered by this RAMS include the completion of the described task in a controlled and "
-        "safe manner, ensuring risks to workers, site personnel, and the public are minimised at all times.",
-        styles["BodyText"]
-    ))
-    story.append(Spacer(1, 10))
-
-    # PPE
-    story.append(Paragraph("<b>Personal Protective Equipment (PPE)</b>", styles["Heading2"]))
-    story.append(Paragraph(
-        "As a minimum, operatives shall wear suitable PPE appropriate to the task, including safety footwear, "
-        "gloves, high-visibility clothing, and eye protection. Additional PPE shall be used where required "
-        "by site rules or specific hazards.",
-        styles["BodyText"]
-    ))
-    story.append(Spacer(1, 10))
-
-    # TOOLS
-    story.append(Paragraph("<b>Tools, Equipment & Materials</b>", styles["Heading2"]))
-    story.append(Paragraph(
-        "All tools and equipment used shall be suitable for purpose, in good condition, and subject to "
-        "pre-use checks. Defective equipment must not be used and shall be removed from service immediately.",
-        styles["BodyText"]
-    ))
-    story.append(Spacer(1, 10))
-
-    # METHOD STATEMENT
-    story.append(Paragraph("<b>Method Statement</b>", styles["Heading2"]))
-    steps = _lines(data["method_steps"]) or [
-        "Arrive on site and sign in accordance with site procedures.",
-        "Review site-specific rules, emergency arrangements, and relevant permits.",
-        "Inspect the work area and implement barriers or signage where required.",
-        "Carry out the task using safe systems of work and appropriate PPE.",
-        "Maintain good housekeeping throughout the works.",
-        "Complete works, clear the area, and sign out of site."
-    ]
-
-    for i, step in enumerate(steps, 1):
-        story.append(Paragraph(f"{i}. {step}", styles["BodyText"]))
-
-    story.append(Spacer(1, 12))
-
-    # RISK ASSESSMENT
-    story.append(Paragraph("<b>Risk Assessment</b>", styles["Heading2"]))
-    hazards = _lines(data["hazards"]) or [
-        "Slips, trips and falls | Operatives / others | Maintain good housekeeping and clear access routes.",
-        "Manual handling | Operatives | Use correct lifting techniques and mechanical aids where required.",
-        "Use of tools and equipment | Operatives | Pre-use checks, correct training, and PPE.",
-    ]
-
-    rows = [["Hazard", "Who May Be Harmed", "Control Measures"]]
-    for h in hazards:
-        parts = [p.strip() for p in h.split("|")]
-        while len(parts) < 3:
-            parts.append("Controls to be reviewed and implemented as appropriate.")
-        rows.append(parts[:3])
-
-    ra_table = Table(rows, colWidths=[160, 140, 200])
-    ra_table.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), colors.black),
-        ("TEXTCOLOR", (0,0), (-1,0), colors.white),
-        ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
-        ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-        ("PADDING", (0,0), (-1,-1), 6),
-    ]))
-    story.append(ra_table)
-    story.append(Spacer(1, 12))
-
-    # EMERGENCY
-    story.append(Paragraph("<b>Emergency Arrangements</b>", styles["Heading2"]))
-    story.append(Paragraph(
-        "In the event of an emergency, all operatives shall follow site emergency procedures. "
-        "First aid facilities and trained first aiders shall be identified prior to works commencing. "
-        "All accidents, incidents, or near misses must be reported immediately.",
-        styles["BodyText"]
-    ))
-    story.append(Spacer(1, 10))
-
-    # COMPLIANCE
-    story.append(Paragraph("<b>Legal Compliance</b>", styles["Heading2"]))
-    story.append(Paragraph(UK_COMPLIANCE, styles["BodyText"]))
-    story.append(Spacer(1, 10))
-
-    # DISCLAIMER
-    story.append(Paragraph("<b>Disclaimer</b>", styles["Heading2"]))
-    story.append(Paragraph(DISCLAIMER, styles["BodyText"]))
-    story.append(Spacer(1, 14))
-
-    # SIGN OFF
-    sign = Table([
-        ["Prepared By", data["supervisor"]],
-        ["Signature", "____________________________"],
-        ["Date", data["job_date"]],
-    ], colWidths=[200, 300])
-    sign.setStyle(TableStyle([
-        ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
-        ("FONTNAME", (0,0), (0,-1), "Helvetica-Bold"),
-        ("PADDING", (0,0), (-1,-1), 6),
-    ]))
-    story.append(sign)
-
-    doc.build(story)
-    return buf.getvalue()
-
-@app.get("/", response_class=HTMLResponse)
-def home():
-    today = date.today().isoformat()
-    return f"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import asyncio
+import gzip
+import hashlib
+import multiprocessing
+import os
+
+import orjson
+
+from rams_core import WARMUP, RamsData, build_pdf, warm_worker
+
+# PDF builds are CPU-bound; run them in worker processes so concurrent
+# requests use every core. "spawn" keeps workers independent of the
+# server's threads and works on every platform. Workers only import
+# rams_core, not the web app.
+def _pool_size() -> int:
+    # RAMS_WORKERS overrides the size; otherwise use the CPUs this process
+    # may run on, which can be fewer than the host's core count.
+    if size := os.environ.get("RAMS_WORKERS"):
+        return max(1, int(size))
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS or Windows
+        return os.cpu_count() or 1
+
+def _new_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=_POOL_SIZE, mp_context=multiprocessing.get_context("spawn"),
+        initializer=warm_worker)
+
+_POOL_SIZE = _pool_size()
+_POOL = _new_pool()
+
+async def _build_in_pool(data: RamsData) -> bytes:
+    # A worker that dies (out of memory, a crash in native code) breaks the
+    # whole executor. Replace it and retry once, so one bad build doesn't
+    # fail every later request; a second break is reported as a 503.
+    global _POOL
+    loop = asyncio.get_running_loop()
+    for _ in range(2):
+        pool = _POOL
+        try:
+            return await loop.run_in_executor(pool, build_pdf, data)
+        except BrokenProcessPool:
+            if _POOL is pool:  # concurrent requests may have replaced it already
+                pool.shutdown(wait=False)
+                _POOL = _new_pool()
+    raise HTTPException(status_code=503, detail="PDF generation failed, please try again.")
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    if WARMUP:
+        # Start every worker, and so run its warm-up, before the first request.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(_POOL, os.getpid) for _ in range(_POOL_SIZE)))
+    yield
+    _POOL.shutdown()
+
+app = FastAPI(lifespan=_lifespan)
+
+# Retries and repeat downloads send identical forms; keep recent PDFs so
+# those skip the build. Keys are a digest of the form fields, so the cache
+# holds 16 bytes per entry rather than the submitted text. Only touched
+# from the event loop, so it needs no lock.
+_PDF_CACHE: OrderedDict[bytes, bytes] = OrderedDict()
+_PDF_CACHE_MAX = 128
+
+def _pdf_cache_key(data: RamsData) -> bytes:
+    return hashlib.blake2b(orjson.dumps(data), digest_size=16).digest()
+
+_HOME_TEMPLATE = """
 <!doctype html>
 <html>
 <head>
 <meta charset="utf-8"/>
 <title>QuickRAMS</title>
 <style>
-body {{ font-family: Arial; max-width: 900px; margin: 40px auto; }}
-input, textarea {{ width: 100%; padding: 10px; margin-bottom: 14px; }}
-button {{ padding: 12px 18px; font-weight: bold; }}
-.note {{ font-size: 0.95em; color: #444; }}
+body { font-family: Arial; max-width: 900px; margin: 40px auto; }
+input, textarea { width: 100%; padding: 10px; margin-bottom: 14px; }
+button { padding: 12px 18px; font-weight: bold; }
+.note { font-size: 0.95em; color: #444; }
 </style>
 </head>
 <body>
@@ -210,7 +107,7 @@ button {{ padding: 12px 18px; font-weight: bold; }}
 <input name="company" placeholder="Company name" required>
 <input name="job_title" placeholder="Job title / description" required>
 <input name="location" placeholder="Site location" required>
-<input name="job_date" value="{today}">
+<input name="job_date" value="{{TODAY}}">
 <input name="workers" placeholder="Number of workers">
 <input name="supervisor" placeholder="Supervisor / responsible person">
 <textarea name="method_steps" rows="5" placeholder="Method steps (one per line)"></textarea>
@@ -222,15 +119,50 @@ button {{ padding: 12px 18px; font-weight: bold; }}
 <script>
 const c=document.getElementById("paidCheck");
 const b=document.getElementById("generateBtn");
-c.addEventListener("change",()=>{{b.disabled=!c.checked;}});
+c.addEventListener("change",()=>{b.disabled=!c.checked;});
 </script>
 
 </body>
 </html>
 """
 
+@lru_cache(maxsize=2)
+def _home_html(today: str) -> str:
+    return _HOME_TEMPLATE.replace("{{TODAY}}", today)
+
+@lru_cache(maxsize=2)
+def _home_gzip(today: str) -> bytes:
+    return gzip.compress(_home_html(today).encode("utf-8"), 9)
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    # "gzip;q=0" explicitly refuses gzip, so look at each coding's q-value
+    # rather than just searching the header for the name.
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() != "gzip":
+            continue
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    today = date.today().isoformat()
+    # Only the home page is compressed: it is mostly repeated markup, while
+    # the PDFs' page streams are already Flate-compressed by ReportLab.
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        return Response(_home_gzip(today), media_type="text/html",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return HTMLResponse(_home_html(today), headers={"Vary": "Accept-Encoding"})
+
 @app.post("/generate")
-def generate(
+async def generate(
     company: str = Form(""),
     job_title: str = Form(""),
     location: str = Form(""),
@@ -240,6 +172,24 @@ def generate(
     method_steps: str = Form(""),
     hazards: str = Form(""),
 ):
-    pdf = build_pdf(locals())
-    return StreamingResponse(BytesIO(pdf), media_type="application/pdf",
+    data = RamsData(
+        company=company.strip(),
+        job_title=job_title.strip(),
+        location=location.strip(),
+        job_date=job_date.strip(),
+        workers=workers.strip(),
+        supervisor=supervisor.strip(),
+        method_steps=method_steps,
+        hazards=hazards,
+    )
+    key = _pdf_cache_key(data)
+    pdf = _PDF_CACHE.get(key)
+    if pdf is None:
+        pdf = await _build_in_pool(data)
+        _PDF_CACHE[key] = pdf
+        if len(_PDF_CACHE) > _PDF_CACHE_MAX:
+            _PDF_CACHE.popitem(last=False)
+    else:
+        _PDF_CACHE.move_to_end(key)
+    return Response(pdf, media_type="application/pdf",
         headers={"Content-Disposition": "attachment; filename=RAMS.pdf"})
@@ -0,0 +1,328 @@
+from io import BytesIO
+from dataclasses import dataclass
+from typing import Iterator
+from xml.sax.saxutils import escape
+import copy
+import os
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus.paragraph import split as _rl_split, strip as _rl_strip
+
+# Set RAMS_WARMUP=0 to skip warming up ReportLab and the worker pool.
+WARMUP = os.environ.get("RAMS_WARMUP", "1") == "1"
+
+DISCLAIMER = (
+    "This Risk Assessment & Method Statement (RAMS) document has been generated for guidance purposes only. "
+    "It does not constitute legal advice. The contractor/company is responsible for reviewing, amending, and "
+    "ensuring the document is suitable for the specific task, site conditions, client requirements, and "
+    "current UK health and safety legislation before use."
+)
+
+UK_COMPLIANCE = (
+    "This RAMS has been prepared with reference to relevant UK legislation including, but not limited to: "
+    "The Health and Safety at Work etc. Act 1974, Management of Health and Safety at Work Regulations 1999, "
+    "Personal Protective Equipment at Work Regulations 2022, COSHH Regulations 2002 (where applicable), "
+    "and the Work at Height Regulations 2005 (where applicable)."
+)
+
+@dataclass(slots=True, frozen=True)
+class RamsData:
+    company: str = ""
+    job_title: str = ""
+    location: str = ""
+    job_date: str = ""
+    workers: str = ""
+    supervisor: str = ""
+    method_steps: str = ""
+    hazards: str = ""
+
+# (label, RamsData field) rows for the job details and sign-off tables.
+_JOB_FIELDS: tuple[tuple[str, str], ...] = (
+    ("Company Name", "company"),
+    ("Job Title / Description", "job_title"),
+    ("Site Location", "location"),
+    ("Date", "job_date"),
+    ("Number of Workers", "workers"),
+    ("Supervisor / Responsible Person", "supervisor"),
+)
+
+_SIGNATURE_LINE = "____________________________"
+_SIGN_FIELDS: tuple[tuple[str, str | None], ...] = (
+    ("Prepared By", "supervisor"),
+    ("Signature", None),
+    ("Date", "job_date"),
+)
+
+_STYLES = getSampleStyleSheet()
+_TITLE = _STYLES["Title"]
+_H2 = _STYLES["Heading2"]
+_BODY = _STYLES["BodyText"]
+
+_DETAILS_TABLE_STYLE = TableStyle([
+    ("SPAN", (0,0), (1,0)),
+    ("BACKGROUND", (0,0), (1,0), colors.black),
+    ("TEXTCOLOR", (0,0), (1,0), colors.white),
+    ("FONTNAME", (0,0), (1,0), "Helvetica-Bold"),
+    ("GRID", (0,0), (1,-1), 0.5, colors.grey),
+    ("FONTNAME", (0,1), (0,-1), "Helvetica-Bold"),
+    ("PADDING", (0,0), (1,-1), 6),
+])
+
+_RA_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0,0), (-1,0), colors.black),
+    ("TEXTCOLOR", (0,0), (-1,0), colors.white),
+    ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
+    ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
+    ("PADDING", (0,0), (-1,-1), 6),
+])
+
+_SIGN_TABLE_STYLE = TableStyle([
+    ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
+    ("FONTNAME", (0,0), (0,-1), "Helvetica-Bold"),
+    ("PADDING", (0,0), (-1,-1), 6),
+])
+
+DEFAULT_STEPS = (
+    "Arrive on site and sign in accordance with site procedures.",
+    "Review site-specific rules, emergency arrangements, and relevant permits.",
+    "Inspect the work area and implement barriers or signage where required.",
+    "Carry out the task using safe systems of work and appropriate PPE.",
+    "Maintain good housekeeping throughout the works.",
+    "Complete works, clear the area, and sign out of site."
+)
+
+DEFAULT_HAZARDS = (
+    ("Slips, trips and falls", "Operatives / others", "Maintain good housekeeping and clear access routes."),
+    ("Manual handling", "Operatives", "Use correct lifting techniques and mechanical aids where required."),
+    ("Use of tools and equipment", "Operatives", "Pre-use checks, correct training, and PPE."),
+)
+
+_TO_BE_REVIEWED = "Controls to be reviewed and implemented as appropriate."
+
+# Fixed document text, parsed once at import. Flowables carry layout state
+# from doc.build, so each request gets a fresh copy via _copy_para.
+_TITLE_PARA = Paragraph("<b>RISK ASSESSMENT & METHOD STATEMENT (RAMS)</b>", _TITLE)
+
+_H_SCOPE = Paragraph("<b>Scope of Works</b>", _H2)
+_SCOPE_PARA = Paragraph(
+    "The works covered by this RAMS include the completion of the described task in a controlled and "
+    "safe manner, ensuring risks to workers, site personnel, and the public are minimised at all times.",
+    _BODY
+)
+
+_H_PPE = Paragraph("<b>Personal Protective Equipment (PPE)</b>", _H2)
+_PPE_PARA = Paragraph(
+    "As a minimum, operatives shall wear suitable PPE appropriate to the task, including safety footwear, "
+    "gloves, high-visibility clothing, and eye protection. Additional PPE shall be used where required "
+    "by site rules or specific hazards.",
+    _BODY
+)
+
+_H_TOOLS = Paragraph("<b>Tools, Equipment & Materials</b>", _H2)
+_TOOLS_PARA = Paragraph(
+    "All tools and equipment used shall be suitable for purpose, in good condition, and subject to "
+    "pre-use checks. Defective equipment must not be used and shall be removed from service immediately.",
+    _BODY
+)
+
+def _steps_markup(steps: list[str] | tuple[str, ...]) -> str:
+    # One numbered line per step in a single paragraph; steps are user text,
+    # so escape it before it reaches ReportLab's markup parser.
+    return "<br/>".join(f"{i}. {escape(step)}" for i, step in enumerate(steps, 1))
+
+# Body-style fragments for a line of text and a <br/>, parsed once. Steps
+# are plain text, so their paragraph is assembled from clones of these
+# rather than by running the escaped markup back through the parser. This
+# leans on ReportLab 5.0.x internals (see requirements.txt); the tests
+# render both ways to catch an upgrade that changes fragment handling.
+_STEP_FRAG, _BREAK_FRAG = Paragraph("x<br/>x", _BODY).frags[:2]
+
+def _steps_paragraph(steps: list[str]) -> Paragraph:
+    frags = []
+    for i, step in enumerate(steps, 1):
+        if frags:
+            frags.append(_BREAK_FRAG.clone())
+        # Collapse whitespace with ReportLab's own helpers, as the parser's
+        # text cleaner does; they leave no-break spaces inside words.
+        words = filter(None, _rl_split(_rl_strip(step)))
+        frags.append(_STEP_FRAG.clone(text=f"{i}. {' '.join(words)}"))
+    # No markup to keep: like the pieces split() makes, the text is None
+    # and the fragments carry the content.
+    return Paragraph(None, _BODY, frags=frags)
+
+_H_METHOD = Paragraph("<b>Method Statement</b>", _H2)
+_DEFAULT_STEPS_PARA = Paragraph(_steps_markup(DEFAULT_STEPS), _BODY)
+
+_H_RISK = Paragraph("<b>Risk Assessment</b>", _H2)
+_RA_HEADER = ["Hazard", "Who May Be Harmed", "Control Measures"]
+_RA_COL_WIDTHS = [160, 140, 200]
+_DEFAULT_RA_TABLE = Table([_RA_HEADER, *(list(row) for row in DEFAULT_HAZARDS)], colWidths=_RA_COL_WIDTHS)
+_DEFAULT_RA_TABLE.setStyle(_RA_TABLE_STYLE)
+
+_H_EMERGENCY = Paragraph("<b>Emergency Arrangements</b>", _H2)
+_EMERGENCY_PARA = Paragraph(
+    "In the event of an emergency, all operatives shall follow site emergency procedures. "
+    "First aid facilities and trained first aiders shall be identified prior to works commencing. "
+    "All accidents, incidents, or near misses must be reported immediately.",
+    _BODY
+)
+
+_H_COMPLIANCE = Paragraph("<b>Legal Compliance</b>", _H2)
+_UK_COMPLIANCE_PARA = Paragraph(UK_COMPLIANCE, _BODY)
+
+_H_DISCLAIMER = Paragraph("<b>Disclaimer</b>", _H2)
+_DISCLAIMER_PARA = Paragraph(DISCLAIMER, _BODY)
+
+class _FixedParagraph(Paragraph):
+    # Fixed text always lands in the same frame, so line breaking is done
+    # once per width and shared by every copy of the same template. Only
+    # single-fragment (kind 0) results are shared: split() edits kind 1
+    # lines in place. Pieces produced by split() have no cache. A hit also
+    # restores the attributes breakLines sets on the paragraph itself.
+    # The list mirrors Paragraph.breakLines in ReportLab 5.0.x (pinned in
+    # requirements.txt); recheck it when upgrading.
+    _BREAK_ATTRS = ("height", "_width_max", "_splitLongWordCount", "_hyphenations")
+
+    def breakLines(self, width):
+        cache = getattr(self, "_line_breaks", None)
+        if cache is None:
+            return Paragraph.breakLines(self, width)
+        key = tuple(width) if isinstance(width, (list, tuple)) else width
+        hit = cache.get(key)
+        if hit is None:
+            bl = Paragraph.breakLines(self, width)
+            if bl.kind == 0:
+                cache[key] = (bl, {a: getattr(self, a) for a in self._BREAK_ATTRS if hasattr(self, a)})
+            return bl
+        bl, attrs = hit
+        self.__dict__.update(attrs)
+        return bl
+
+def _copy_para(para: Paragraph) -> Paragraph:
+    # Reuses the parsed fragments, skipping the markup parser, and the
+    # template's line breaks, skipping most of the layout work.
+    para_copy = _FixedParagraph(para.text, para.style, frags=para.frags)
+    para_copy._line_breaks = para.__dict__.setdefault("_line_breaks", {})
+    return para_copy
+
+def _iter_lines(text: str) -> Iterator[str]:
+    for ln in (text or "").splitlines():
+        if s := ln.strip():
+            yield s
+
+def _lines(text: str) -> list[str]:
+    return [s for ln in (text or "").splitlines() if (s := ln.strip())]
+
+def _parse_hazards(text: str) -> list[list[str]]:
+    # "Hazard | Who | Controls" per line; missing columns get a placeholder
+    # and anything past the third column is ignored.
+    rows: list[list[str]] = []
+    for ln in _iter_lines(text):
+        hazard, sep, rest = ln.partition("|")
+        if not sep:
+            rows.append([hazard, _TO_BE_REVIEWED, _TO_BE_REVIEWED])
+            continue
+        who, sep, rest = rest.partition("|")
+        controls = rest.partition("|")[0].strip() if sep else _TO_BE_REVIEWED
+        rows.append([hazard.strip(), who.strip(), controls])
+    return rows
+
+def build_pdf(data: RamsData) -> bytes:
+    buf = BytesIO()
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=A4,
+        leftMargin=36,
+        rightMargin=36,
+        topMargin=36,
+        bottomMargin=36
+    )
+
+    story = []
+
+    # TITLE
+    story.append(_copy_para(_TITLE_PARA))
+    story.append(Spacer(1, 12))
+
+    # JOB DETAILS TABLE
+    details = [["Project Details", ""]]
+    details.extend([label, getattr(data, field)] for label, field in _JOB_FIELDS)
+
+    table = Table(details, colWidths=[180, 320])
+    table.setStyle(_DETAILS_TABLE_STYLE)
+    story.append(table)
+    story.append(Spacer(1, 14))
+
+    # SCOPE OF WORKS
+    story.append(_copy_para(_H_SCOPE))
+    story.append(_copy_para(_SCOPE_PARA))
+    story.append(Spacer(1, 10))
+
+    # PPE
+    story.append(_copy_para(_H_PPE))
+    story.append(_copy_para(_PPE_PARA))
+    story.append(Spacer(1, 10))
+
+    # TOOLS
+    story.append(_copy_para(_H_TOOLS))
+    story.append(_copy_para(_TOOLS_PARA))
+    story.append(Spacer(1, 10))
+
+    # METHOD STATEMENT
+    story.append(_copy_para(_H_METHOD))
+    steps = _lines(data.method_steps)
+    if steps:
+        story.append(_steps_paragraph(steps))
+    else:
+        story.append(_copy_para(_DEFAULT_STEPS_PARA))
+
+    story.append(Spacer(1, 12))
+
+    # RISK ASSESSMENT
+    story.append(_copy_para(_H_RISK))
+    hazard_rows = _parse_hazards(data.hazards)
+    if hazard_rows:
+        ra_table = Table([_RA_HEADER, *hazard_rows], colWidths=_RA_COL_WIDTHS)
+        ra_table.setStyle(_RA_TABLE_STYLE)
+    else:
+        # Layout state is set on the flowable, so build with a shallow copy
+        # and leave the shared template untouched.
+        ra_table = copy.copy(_DEFAULT_RA_TABLE)
+    story.append(ra_table)
+    story.append(Spacer(1, 12))
+
+    # EMERGENCY
+    story.append(_copy_para(_H_EMERGENCY))
+    story.append(_copy_para(_EMERGENCY_PARA))
+    story.append(Spacer(1, 10))
+
+    # COMPLIANCE
+    story.append(_copy_para(_H_COMPLIANCE))
+    story.append(_copy_para(_UK_COMPLIANCE_PARA))
+    story.append(Spacer(1, 10))
+
+    # DISCLAIMER
+    story.append(_copy_para(_H_DISCLAIMER))
+    story.append(_copy_para(_DISCLAIMER_PARA))
+    story.append(Spacer(1, 14))
+
+    # SIGN OFF
+    sign = Table(
+        [[label, getattr(data, field) if field else _SIGNATURE_LINE] for label, field in _SIGN_FIELDS],
+        colWidths=[200, 300]
+    )
+    sign.setStyle(_SIGN_TABLE_STYLE)
+    story.append(sign)
+
+    doc.build(story)
+    return buf.getvalue()
+
+def warm_worker() -> None:
+    # Pool initializer, so it runs once in each worker process and never in
+    # the web server. One throwaway render loads ReportLab's font metrics and
+    # fills the fixed text's line-break caches before the first real build.
+    if WARMUP:
+        build_pdf(RamsData())
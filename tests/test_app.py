@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+class _FakePool(Executor):
+    # Runs builds in-process, or fails the way a pool with a dead worker does.
+    def __init__(self, broken):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, fn, /, *args, **kwargs):
+        if self.broken:
+            raise BrokenProcessPool("A child process terminated abruptly")
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, "_PDF_CACHE", OrderedDict())
+    # Not entered as a context manager, so the lifespan never starts workers.
+    return TestClient(app.app)
+
+def _use_pools(monkeypatch, *pools):
+    monkeypatch.setattr(app, "_POOL", pools[0])
+    replacements = iter(pools[1:])
+    monkeypatch.setattr(app, "_new_pool", lambda: next(replacements))
+
+def test_generate_replaces_broken_pool(monkeypatch, client):
+    broken, healthy = _FakePool(broken=True), _FakePool(broken=False)
+    _use_pools(monkeypatch, broken, healthy)
+    resp = client.post("/generate", data={"company": "Acme"})
+    assert resp.status_code == 200
+    assert resp.content.startswith(b"%PDF")
+    assert broken.shut_down
+    assert app._POOL is healthy
+
+def test_generate_reports_503_when_replacement_breaks(monkeypatch, client):
+    _use_pools(monkeypatch, _FakePool(broken=True), _FakePool(broken=True), _FakePool(broken=False))
+    resp = client.post("/generate", data={"company": "Acme"})
+    assert resp.status_code == 503
+    assert not app._PDF_CACHE
+
+def test_home_gzip_and_identity_serve_same_page(client):
+    # The client decodes gzip bodies, so both texts compare as plain HTML.
+    zipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert zipped.text == plain.text
+    assert "<form" in plain.text
+    for resp in (zipped, plain):
+        assert resp.headers["vary"] == "Accept-Encoding"
+
+@pytest.mark.parametrize("accept", ["gzip;q=0", "br, gzip; q=0.0", "deflate", ""])
+def test_home_not_gzipped_when_refused(client, accept):
+    resp = client.get("/", headers={"Accept-Encoding": accept})
+    assert "content-encoding" not in resp.headers
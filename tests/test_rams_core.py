@@ -0,0 +1,70 @@
+from io import BytesIO
+import re
+
+import pytest
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Spacer
+
+import rams_core
+from rams_core import RamsData, build_pdf, _BODY, _TO_BE_REVIEWED, _copy_para, _parse_hazards, _steps_markup, _steps_paragraph, Paragraph
+
+@pytest.mark.parametrize("text, rows", [
+    ("Dust", [["Dust", _TO_BE_REVIEWED, _TO_BE_REVIEWED]]),
+    ("Noise | Operatives", [["Noise", "Operatives", _TO_BE_REVIEWED]]),
+    ("a|", [["a", "", _TO_BE_REVIEWED]]),
+    ("a||c", [["a", "", "c"]]),
+    ("|", [["", "", _TO_BE_REVIEWED]]),
+    ("a|b|c|d", [["a", "b", "c"]]),
+    ("  \nFalls | Public | Barriers \n\n", [["Falls", "Public", "Barriers"]]),
+    ("", []),
+])
+def test_parse_hazards(text, rows):
+    assert _parse_hazards(text) == rows
+
+def _line_texts(bl):
+    if bl.kind == 0:
+        return [" ".join(words) for _, words in bl.lines]
+    return ["".join(getattr(f, "text", "") for f in line.words) for line in bl.lines]
+
+@pytest.mark.parametrize("steps", [
+    ["word " * 18 + "keep\xa0together"],
+    ["Lift & shift", "Check x < y and y > z", "Tom &amp; Jerry"],
+    ["  spaced\tout   words  ", " em space nbsp"],
+    ["Carry out the task using safe systems of work and appropriate PPE. " * 12, "short"],
+])
+@pytest.mark.parametrize("width", [100, 300, 523])
+def test_steps_paragraph_breaks_like_parser(steps, width):
+    parsed = Paragraph(_steps_markup(steps), _BODY)
+    built = _steps_paragraph(steps)
+    assert _line_texts(built.breakLines([width, width])) == _line_texts(parsed.breakLines([width, width]))
+
+def _page_streams(pdf):
+    # Content streams with adjacent text runs merged: the parser emits one
+    # run per entity, built fragments one per line.
+    return [re.sub(rb"\) Tj \(", b"", s) for s in re.findall(rb"stream\r?\n(.*?)endstream", pdf, re.S)]
+
+def test_build_pdf_renders_steps_like_parser(monkeypatch):
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    monkeypatch.setattr(rl_config, "pageCompression", 0)
+    data = RamsData(method_steps="Lift & shift\nCheck x < y and y > z\nTom &amp; Jerry\n"
+                                 "keep\xa0together " + "word " * 40)
+    built = build_pdf(data)
+    monkeypatch.setattr(rams_core, "_steps_paragraph", lambda steps: Paragraph(_steps_markup(steps), _BODY))
+    assert _page_streams(built) == _page_streams(build_pdf(data))
+
+def _render(flowables):
+    buf = BytesIO()
+    SimpleDocTemplate(buf, pagesize=A4, leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36).build(flowables)
+    return buf.getvalue()
+
+@pytest.mark.parametrize("name", ["_SCOPE_PARA", "_PPE_PARA", "_DISCLAIMER_PARA", "_H_TOOLS"])
+def test_copied_paragraph_renders_like_fresh(monkeypatch, name):
+    # Push the paragraph across the page bottom so split() runs on the
+    # shared line breaks; the second build of each height is a cache hit.
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    template = getattr(rams_core, name)
+    for gap in range(620, 756, 3):
+        fresh = _render([Spacer(1, gap), Paragraph(template.text, template.style)])
+        for _ in range(2):
+            assert _render([Spacer(1, gap), _copy_para(template)]) == fresh